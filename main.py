@@ -4,28 +4,156 @@ Accepts YAML content via POST, generates PDF, uploads to Supabase Storage.
 Returns JSON with public URL and processing logs.
 """
 
+import atexit
 import os
+import re
+import secrets
+import shutil
 import tempfile
-import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request
+import orjson
+from blake3 import blake3
 import requests as http_requests
 
 import typst
+import yaml
+
+# Prefer libyaml-backed loader/dumper; fall back to pure Python if unavailable
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+# Import RenderCV once at startup (shared with workers under preload_app);
+# a failure is reported per request instead of crashing the server
+try:
+    from rendercv.schema.rendercv_model_builder import (
+        build_rendercv_dictionary_and_model,
+    )
+    from rendercv.renderer.typst import generate_typst
+    from rendercv.exception import RenderCVUserValidationError
+    _RENDERCV_IMPORT_ERR = None
+except ImportError as e:
+    _RENDERCV_IMPORT_ERR = str(e)
+
+# Reject request bodies above this size before reading them (Flask returns 413)
+MAX_CONTENT_LENGTH = 2 * 1024 * 1024
+
+# Upper bound on resumes per /batch request, to stay within the worker timeout
+MAX_BATCH_RECORDS = 50
 
 app = Flask(__name__)
+app.config["MAX_CONTENT_LENGTH"] = MAX_CONTENT_LENGTH
 
 # Supabase configuration from environment variables (strip whitespace from values)
 SUPABASE_URL = (os.environ.get("SUPABASE_URL") or "").strip()
 SUPABASE_KEY = (os.environ.get("SUPABASE_KEY") or "").strip().replace("\n", "").replace(" ", "")
 SUPABASE_BUCKET = (os.environ.get("SUPABASE_BUCKET") or "resumes").strip()
 
+# Shared HTTP session so uploads reuse pooled keep-alive connections to Supabase
+_HTTP_SESSION = http_requests.Session()
+
+# Background pool for uploads so responses don't wait on Supabase. The number of
+# queued uploads (each holding its PDF bytes) is capped; when the queue is full
+# requests upload synchronously instead.
+MAX_QUEUED_UPLOADS = 32
+# Time a worker waits for queued uploads on exit; must stay below graceful_timeout
+UPLOAD_DRAIN_TIMEOUT = 20
+_UPLOAD_EXECUTOR = ThreadPoolExecutor(max_workers=8, thread_name_prefix="supabase-upload")
+_PENDING_UPLOADS: "set[Future]" = set()
+_UPLOAD_LOCK = threading.Lock()
+_failed_uploads = 0
+
+# Matches a top-level `design:` block whose direct children include `theme: <value>`
+_THEME_RE = re.compile(r"^design:[ \t]*\n([ \t]+)(?:.*\n\1)*?theme:[ \t]*\S", re.MULTILINE)
+
+# Per-thread scratch directories under one root, reused across requests.
+# The root is created before gunicorn forks (preload_app), so subdirectories
+# are keyed by pid and thread id; only the creating process removes it.
+_SCRATCH_ROOT = Path(tempfile.mkdtemp(prefix="rcv-"))
+_SCRATCH_OWNER_PID = os.getpid()
+_scratch_local = threading.local()
+
+
+@atexit.register
+def _remove_scratch_root() -> None:
+    if os.getpid() == _SCRATCH_OWNER_PID:
+        shutil.rmtree(_SCRATCH_ROOT, ignore_errors=True)
+
+
+def scratch_dir() -> Path:
+    """Return this thread's scratch directory, emptied for a new request."""
+    path = getattr(_scratch_local, "path", None)
+    if path is None:
+        path = _SCRATCH_ROOT / f"{os.getpid()}-{threading.get_ident():x}"
+        path.mkdir(parents=True, exist_ok=True)
+        _scratch_local.path = path
+        return path
+    for entry in path.iterdir():
+        if entry.is_dir() and not entry.is_symlink():
+            shutil.rmtree(entry)
+        else:
+            entry.unlink()
+    return path
+
+
+# Per-thread Typst compilers, so font discovery and package setup happen once
+# per thread rather than per request. Created lazily, i.e. after gunicorn forks.
+_compiler_local = threading.local()
+
+
+def typst_compiler() -> typst.Compiler:
+    """Return this thread's reusable Typst compiler."""
+    compiler = getattr(_compiler_local, "compiler", None)
+    if compiler is None:
+        compiler = typst.Compiler(root=str(_SCRATCH_ROOT))
+        _compiler_local.compiler = compiler
+    return compiler
+
+
+# In-process cache of public URLs for already uploaded PDFs, keyed by a hash of
+# the normalized YAML (theme already injected). Shared by all worker threads.
+_PDF_CACHE_MAX = 64
+_BLAKE3_THREADED_MIN = 1024 * 1024
+_PDF_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_PDF_CACHE_LOCK = threading.Lock()
+
+
+def cache_key(yaml_content: str) -> str:
+    """Hash normalized YAML content into a cache key."""
+    data = yaml_content.encode("utf-8")
+    # Multithreaded hashing only pays off on large inputs
+    max_threads = blake3.AUTO if len(data) >= _BLAKE3_THREADED_MIN else 1
+    return blake3(data, max_threads=max_threads).hexdigest()
+
+
+def cache_get(cache: OrderedDict, lock: threading.Lock, key: str):
+    """Return cached value for key (marking it recently used), or None."""
+    with lock:
+        value = cache.get(key)
+        if value is not None:
+            cache.move_to_end(key)
+        return value
+
+
+def cache_put(cache: OrderedDict, lock: threading.Lock, key: str, value, max_size: int) -> None:
+    """Insert value into cache, evicting least recently used entries."""
+    with lock:
+        cache[key] = value
+        cache.move_to_end(key)
+        while len(cache) > max_size:
+            cache.popitem(last=False)
+
 
 def upload_to_supabase(file_bytes: bytes, file_path: str) -> str:
     """Upload file to Supabase Storage using REST API. Returns public URL."""
     upload_url = f"{SUPABASE_URL}/storage/v1/object/{SUPABASE_BUCKET}/{file_path}"
 
-    response = http_requests.post(
+    response = _HTTP_SESSION.post(
         upload_url,
         headers={
             "Authorization": f"Bearer {SUPABASE_KEY}",
@@ -38,16 +166,85 @@ def upload_to_supabase(file_bytes: bytes, file_path: str) -> str:
     if response.status_code not in (200, 201):
         raise Exception(f"Upload failed ({response.status_code}): {response.text}")
 
+    return public_url_for(file_path)
+
+
+def public_url_for(file_path: str) -> str:
+    """Return the public Supabase Storage URL for an uploaded file."""
     return f"{SUPABASE_URL}/storage/v1/object/public/{SUPABASE_BUCKET}/{file_path}"
 
+
+def upload_in_background(file_bytes: bytes, file_path: str, key: str) -> None:
+    """Upload file from the background pool; cache the result only on success."""
+    global _failed_uploads
+    try:
+        public_url = upload_to_supabase(file_bytes, file_path)
+    except Exception as e:
+        with _UPLOAD_LOCK:
+            _failed_uploads += 1
+        app.logger.error(f"Background Supabase upload failed for {file_path}: {str(e)}")
+        return
+    cache_put(_PDF_CACHE, _PDF_CACHE_LOCK, key, public_url, _PDF_CACHE_MAX)
+
+
+def queue_upload(file_bytes: bytes, file_path: str, key: str) -> bool:
+    """Queue a background upload. Returns False if the queue is full."""
+    with _UPLOAD_LOCK:
+        if len(_PENDING_UPLOADS) >= MAX_QUEUED_UPLOADS:
+            return False
+        future = _UPLOAD_EXECUTOR.submit(upload_in_background, file_bytes, file_path, key)
+        _PENDING_UPLOADS.add(future)
+    future.add_done_callback(_discard_pending_upload)
+    return True
+
+
+def _discard_pending_upload(future: Future) -> None:
+    with _UPLOAD_LOCK:
+        _PENDING_UPLOADS.discard(future)
+
+
+def drain_uploads(timeout: float = UPLOAD_DRAIN_TIMEOUT) -> None:
+    """Wait for queued uploads before the worker exits and log any that are lost."""
+    with _UPLOAD_LOCK:
+        pending = list(_PENDING_UPLOADS)
+    _, not_done = wait(pending, timeout=timeout)
+    for future in not_done:
+        future.cancel()
+    with _UPLOAD_LOCK:
+        failed = _failed_uploads
+    if pending or failed:
+        app.logger.warning(
+            f"Upload queue at exit: {len(pending)} queued, "
+            f"{len(not_done) + failed} lost ({len(not_done)} unfinished, {failed} failed)"
+        )
+
+
+def body_too_large() -> bool:
+    """Return True if the request body exceeds MAX_CONTENT_LENGTH."""
+    if request.content_length is not None:
+        return request.content_length > MAX_CONTENT_LENGTH
+    # Chunked bodies have no Content-Length: Werkzeug silently stops reading at
+    # the limit instead of raising 413, so a body that fills it was truncated
+    return len(request.get_data(cache=True)) >= MAX_CONTENT_LENGTH
+
+
+def ojson(obj, status: int = 200) -> Response:
+    """Serialize obj with orjson into a JSON response."""
+    return Response(orjson.dumps(obj), status=status, mimetype="application/json")
+
+
 # Hardcoded API URL for self-reference (not needed but kept for clarity)
 API_URL = "https://typst-api-production.up.railway.app"
 
 
+# Health check body is constant, so serialize it once
+_HEALTH_BODY = orjson.dumps({"status": "ok", "service": "rendercv-api"})
+
+
 @app.route("/", methods=["GET"])
 def health():
     """Health check endpoint."""
-    return {"status": "ok", "service": "rendercv-api"}
+    return Response(_HEALTH_BODY, mimetype="application/json", headers={"Cache-Control": "no-store"})
 
 
 @app.route("/", methods=["POST"])
@@ -60,20 +257,27 @@ def generate_resume():
     """
     logs = []
 
+    # Reject oversized bodies before parsing them
+    if body_too_large():
+        return ojson({"success": False, "error": "Payload too large", "logs": logs}, status=413)
+
     try:
         # Get YAML content from request
-        content_type = request.content_type or ""
-
-        if "application/json" in content_type:
-            data = request.get_json()
+        if request.is_json:
+            data = request.get_json(silent=True, cache=True)
+            if not isinstance(data, dict):
+                return ojson({"success": False, "error": "Invalid JSON body", "logs": logs}, status=400)
             yaml_content = data.get("yaml_content", "")
             theme = data.get("theme", "classic")
         else:
-            yaml_content = request.get_data(as_text=True)
+            try:
+                yaml_content = request.get_data().decode("utf-8", "strict")
+            except UnicodeDecodeError:
+                return ojson({"success": False, "error": "Request body is not valid UTF-8", "logs": logs}, status=400)
             theme = request.args.get("theme", "classic")
 
         if not yaml_content:
-            return jsonify({"success": False, "error": "No YAML content provided", "logs": logs}), 400
+            return ojson({"success": False, "error": "No YAML content provided", "logs": logs}, status=400)
 
         logs.append(f"Received YAML ({len(yaml_content)} chars)")
         logs.append(f"Theme: {theme}")
@@ -81,131 +285,256 @@ def generate_resume():
         # Clean up markdown code block markers if present
         yaml_content = clean_yaml_content(yaml_content)
 
-        # Import RenderCV components
+        # Inject theme if not specified
+        yaml_content = inject_theme(yaml_content, theme)
+
+        # Serve identical requests from the PDF cache
+        key = cache_key(yaml_content)
+        public_url = cache_get(_PDF_CACHE, _PDF_CACHE_LOCK, key)
+        if public_url is not None:
+            logs.append("Cache hit: reusing previously compiled PDF")
+            return ojson({
+                "success": True,
+                "url": public_url,
+                "logs": logs
+            })
+
         try:
-            from rendercv.schema.rendercv_model_builder import (
-                build_rendercv_dictionary_and_model,
-            )
-            from rendercv.renderer.typst import generate_typst
-            from rendercv.exception import RenderCVUserValidationError
-        except ImportError as e:
-            logs.append(f"ERROR: RenderCV import failed: {str(e)}")
-            return jsonify({"success": False, "error": f"RenderCV import failed: {str(e)}", "logs": logs}), 500
-
-        # Create temporary directory for processing
-        with tempfile.TemporaryDirectory() as temp_dir:
-            temp_path = Path(temp_dir)
-            output_dir = temp_path / "output"
-            output_dir.mkdir(exist_ok=True)
-
-            # Inject theme if not specified
-            yaml_content = inject_theme(yaml_content, theme)
+            pdf_bytes = compile_resume(yaml_content, logs)
+        except ResumeError as e:
+            logs.append(f"ERROR: {e.message}")
+            return ojson({"success": False, "error": e.message, "logs": logs}, status=e.status)
+
+        # Step 4: Upload to Supabase Storage
+        if not SUPABASE_URL or not SUPABASE_KEY:
+            logs.append("ERROR: Supabase not configured")
+            return ojson({
+                "success": False,
+                "error": "Supabase storage not configured. Set SUPABASE_URL and SUPABASE_KEY environment variables.",
+                "logs": logs
+            }, status=500)
+
+        file_id = secrets.token_hex(16)
+        file_name = f"{file_id}.pdf"
+
+        # Default: return the deterministic URL now and upload in the background.
+        # Pass ?wait=1 (or hit a full upload queue) to block until the upload has completed.
+        if request.args.get("wait") != "1" and queue_upload(pdf_bytes, file_name, key):
+            logs.append(f"Queued upload to Supabase: {file_name}")
+            return ojson({
+                "success": True,
+                "url": public_url_for(file_name),
+                "logs": logs
+            })
 
-            # Step 1: Build RenderCV model
-            try:
-                _, rendercv_model = build_rendercv_dictionary_and_model(
-                    yaml_content,
-                    pdf_path=output_dir / "resume.pdf",
-                    dont_generate_png=True,
-                    dont_generate_html=True,
-                    dont_generate_markdown=True,
-                )
-                logs.append(f"Built RenderCV model: {rendercv_model.cv.name}")
-            except RenderCVUserValidationError as e:
-                errors = format_validation_errors(e.validation_errors)
-                logs.append(f"ERROR: YAML validation failed: {errors}")
-                return jsonify({"success": False, "error": f"YAML validation failed: {errors}", "logs": logs}), 400
-            except Exception as e:
-                logs.append(f"ERROR: Model build failed: {str(e)}")
-                return jsonify({"success": False, "error": f"Model build failed: {str(e)}", "logs": logs}), 400
-
-            # Step 2: Generate Typst file
-            try:
-                typst_path = generate_typst(rendercv_model)
-                logs.append("Generated Typst file")
-            except Exception as e:
-                logs.append(f"ERROR: Typst generation failed: {str(e)}")
-                return jsonify({"success": False, "error": f"Typst generation failed: {str(e)}", "logs": logs}), 500
+        try:
+            public_url = upload_to_supabase(pdf_bytes, file_name)
+            logs.append(f"Uploaded to Supabase: {file_name}")
 
-            # Step 3: Compile Typst to PDF
-            try:
-                pdf_bytes = typst.compile(typst_path)
-                logs.append(f"Compiled PDF ({len(pdf_bytes)} bytes)")
-            except Exception as e:
-                logs.append(f"ERROR: Typst compilation failed: {str(e)}")
-                return jsonify({"success": False, "error": f"Typst compilation failed: {str(e)}", "logs": logs}), 500
-
-            # Step 4: Upload to Supabase Storage
-            if not SUPABASE_URL or not SUPABASE_KEY:
-                logs.append("ERROR: Supabase not configured")
-                return jsonify({
-                    "success": False,
-                    "error": "Supabase storage not configured. Set SUPABASE_URL and SUPABASE_KEY environment variables.",
-                    "logs": logs
-                }), 500
+            cache_put(_PDF_CACHE, _PDF_CACHE_LOCK, key, public_url, _PDF_CACHE_MAX)
 
-            try:
-                file_id = str(uuid.uuid4())
-                file_name = f"{file_id}.pdf"
-
-                public_url = upload_to_supabase(pdf_bytes, file_name)
-                logs.append(f"Uploaded to Supabase: {file_name}")
-
-                return jsonify({
-                    "success": True,
-                    "url": public_url,
-                    "logs": logs
-                })
-
-            except Exception as e:
-                logs.append(f"ERROR: Supabase upload failed: {str(e)}")
-                return jsonify({
-                    "success": False,
-                    "error": f"Supabase upload failed: {str(e)}",
-                    "logs": logs
-                }), 500
+            return ojson({
+                "success": True,
+                "url": public_url,
+                "logs": logs
+            })
+
+        except Exception as e:
+            logs.append(f"ERROR: Supabase upload failed: {str(e)}")
+            return ojson({
+                "success": False,
+                "error": f"Supabase upload failed: {str(e)}",
+                "logs": logs
+            }, status=500)
 
     except Exception as e:
         logs.append(f"ERROR: Unexpected error: {str(e)}")
-        return jsonify({"success": False, "error": str(e), "logs": logs}), 500
+        return ojson({"success": False, "error": str(e), "logs": logs}, status=500)
+
+
+@app.route("/batch", methods=["POST"])
+def generate_batch():
+    """
+    Generate several PDF resumes in one request.
+
+    Accepts: application/json {"theme": "...", "records": [YAML string or object, ...]}
+    Returns: JSON with one {success, url | error, logs} result per record
+    """
+    if body_too_large():
+        return ojson({"success": False, "error": "Payload too large"}, status=413)
+
+    data = request.get_json(silent=True, cache=True)
+    if not isinstance(data, dict):
+        return ojson({"success": False, "error": "Invalid JSON body"}, status=400)
+
+    records = data.get("records")
+    theme = data.get("theme", "classic")
+    if not isinstance(records, list) or not records:
+        return ojson({"success": False, "error": "No records provided"}, status=400)
+    if len(records) > MAX_BATCH_RECORDS:
+        return ojson({"success": False, "error": f"Too many records (max {MAX_BATCH_RECORDS})"}, status=400)
+
+    if not SUPABASE_URL or not SUPABASE_KEY:
+        return ojson({
+            "success": False,
+            "error": "Supabase storage not configured. Set SUPABASE_URL and SUPABASE_KEY environment variables.",
+        }, status=500)
+
+    wait_for_upload = request.args.get("wait") == "1"
+    results = []
+    pending = []
+
+    # Compile sequentially on this thread's compiler; uploads run in parallel on the upload pool
+    for record in records:
+        logs = []
+        result = {"success": False, "logs": logs}
+        results.append(result)
+        try:
+            if isinstance(record, dict):
+                yaml_content = yaml.dump(record, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False, sort_keys=False)
+            elif isinstance(record, str):
+                yaml_content = clean_yaml_content(record)
+            else:
+                raise ResumeError("Record must be a YAML string or an object", 400)
+            if not yaml_content:
+                raise ResumeError("No YAML content provided", 400)
+
+            yaml_content = inject_theme(yaml_content, theme)
+            key = cache_key(yaml_content)
+            cached_url = cache_get(_PDF_CACHE, _PDF_CACHE_LOCK, key)
+            if cached_url is not None:
+                logs.append("Cache hit: reusing previously compiled PDF")
+                result.update(success=True, url=cached_url)
+                continue
+
+            pdf_bytes = compile_resume(yaml_content, logs)
+        except ResumeError as e:
+            logs.append(f"ERROR: {e.message}")
+            result["error"] = e.message
+            continue
+        except Exception as e:
+            logs.append(f"ERROR: Unexpected error: {str(e)}")
+            result["error"] = str(e)
+            continue
+
+        file_name = f"{secrets.token_hex(16)}.pdf"
+        if not wait_for_upload and queue_upload(pdf_bytes, file_name, key):
+            logs.append(f"Queued upload to Supabase: {file_name}")
+            result.update(success=True, url=public_url_for(file_name))
+        else:
+            pending.append((result, key, file_name,
+                            _UPLOAD_EXECUTOR.submit(upload_to_supabase, pdf_bytes, file_name)))
+
+    for result, key, file_name, future in pending:
+        try:
+            public_url = future.result()
+        except Exception as e:
+            result["logs"].append(f"ERROR: Supabase upload failed: {str(e)}")
+            result["error"] = f"Supabase upload failed: {str(e)}"
+            continue
+        result["logs"].append(f"Uploaded to Supabase: {file_name}")
+        cache_put(_PDF_CACHE, _PDF_CACHE_LOCK, key, public_url, _PDF_CACHE_MAX)
+        result.update(success=True, url=public_url)
+
+    return ojson({
+        "success": all(r["success"] for r in results),
+        "results": results,
+    })
+
+
+class ResumeError(Exception):
+    """A pipeline step failed; carries the client-facing message and HTTP status."""
+
+    def __init__(self, message: str, status: int):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def compile_resume(yaml_content: str, logs: list) -> bytes:
+    """Run the RenderCV pipeline on normalized YAML and return the PDF bytes."""
+    # Check RenderCV components are available
+    if _RENDERCV_IMPORT_ERR:
+        raise ResumeError(f"RenderCV import failed: {_RENDERCV_IMPORT_ERR}", 500)
+
+    # Reuse this thread's scratch directory for processing
+    temp_path = scratch_dir()
+    output_dir = temp_path / "output"
+    output_dir.mkdir(exist_ok=True)
+
+    # Step 1: Build RenderCV model
+    try:
+        _, rendercv_model = build_rendercv_dictionary_and_model(
+            yaml_content,
+            pdf_path=output_dir / "resume.pdf",
+            dont_generate_png=True,
+            dont_generate_html=True,
+            dont_generate_markdown=True,
+        )
+        logs.append(f"Built RenderCV model: {rendercv_model.cv.name}")
+    except RenderCVUserValidationError as e:
+        errors = format_validation_errors(e.validation_errors)
+        raise ResumeError(f"YAML validation failed: {errors}", 400)
+    except Exception as e:
+        raise ResumeError(f"Model build failed: {str(e)}", 400)
+
+    # Step 2: Generate Typst file
+    try:
+        typst_path = generate_typst(rendercv_model)
+        logs.append("Generated Typst file")
+    except Exception as e:
+        raise ResumeError(f"Typst generation failed: {str(e)}", 500)
+
+    # Step 3: Compile Typst to PDF
+    try:
+        # Compile from in-memory source; root keeps relative asset paths resolvable
+        typst_source = Path(typst_path).read_bytes()
+        pdf_bytes = typst_compiler().compile(typst_source, root=str(Path(typst_path).parent))
+        logs.append(f"Compiled PDF ({len(pdf_bytes)} bytes)")
+    except Exception as e:
+        raise ResumeError(f"Typst compilation failed: {str(e)}", 500)
+
+    return pdf_bytes
 
 
 def clean_yaml_content(yaml_content: str) -> str:
     """Remove markdown code block markers from YAML content."""
-    import re
     content = yaml_content.strip()
-    content = re.sub(r'^```(?:yaml|yml)?\s*\n?', '', content, flags=re.IGNORECASE)
-    content = re.sub(r'\n?```\s*$', '', content)
+    if content.startswith("```"):
+        # Drop the opening fence line, including any language tag
+        content = content.split("\n", 1)[1] if "\n" in content else ""
+    if content.endswith("```"):
+        content = content.rsplit("```", 1)[0]
     return content.strip()
 
 
 def inject_theme(yaml_content: str, theme: str) -> str:
     """Inject theme into YAML if not already specified."""
-    import yaml
+    # Theme already set: skip the parse/dump round-trip and keep user formatting
+    if _THEME_RE.search(yaml_content):
+        return yaml_content
     try:
-        data = yaml.safe_load(yaml_content)
+        data = yaml.load(yaml_content, Loader=_YamlLoader)
         if data is None:
             data = {}
         if "design" not in data:
             data["design"] = {}
         if "theme" not in data["design"]:
             data["design"]["theme"] = theme
-        return yaml.dump(data, allow_unicode=True, default_flow_style=False)
+        return yaml.dump(data, Dumper=_YamlDumper, allow_unicode=True, default_flow_style=False, sort_keys=False)
     except yaml.YAMLError:
         return yaml_content
 
 
 def format_validation_errors(errors: list) -> str:
     """Format validation errors into readable string."""
-    error_msgs = []
-    for i, error in enumerate(errors, 1):
+    def fmt(i: int, error) -> str:
         if isinstance(error, dict):
-            loc = ".".join(str(x) for x in error.get("loc", []))
-            msg = error.get("msg", "Unknown error")
-            error_msgs.append(f"{i}. {loc}: {msg}")
-        else:
-            error_msgs.append(f"{i}. {str(error)}")
-    return "; ".join(error_msgs)
+            loc = ".".join(map(str, error.get("loc", ())))
+            return f"{i}. {loc}: {error.get('msg', 'Unknown error')}"
+        return f"{i}. {error}"
+
+    return "; ".join(fmt(i, error) for i, error in enumerate(errors, 1))
 
 
 if __name__ == "__main__":
@@ -230,8 +559,13 @@ if __name__ == "__main__":
 
         options = {
             "bind": f"0.0.0.0:{port}",
-            "workers": 2,
+            "workers": max(2, os.cpu_count() or 1),
+            "worker_class": "gthread",
+            "threads": 4,
+            "preload_app": True,
             "timeout": 120,
+            "graceful_timeout": 30,
+            "worker_exit": lambda server, worker: drain_uploads(),
         }
         StandaloneApplication(app, options).run()
     else: